@@ -4,12 +4,23 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Optional, Tuple
 
-from libtmux.pane import Pane as TmuxPane
+
+@dataclass
+class PaneInfo:
+    """The pane fields the renaming logic needs, parsed from one list-panes call
+
+    Cheaper than libtmux Pane objects which proxy every attribute read
+    """
+
+    pane_id: str
+    pane_pid: int
+    window_id: str
+    pane_current_path: Optional[str]
 
 
 @dataclass
 class Pane:
-    info: TmuxPane
+    info: PaneInfo
     program: Optional[str]  # None when no program is running
 
 
@@ -1,5 +1,7 @@
 #!/usr/bin/env python3
 
+import ast
+import functools
 import logging
 import logging.config
 import tempfile
@@ -7,17 +9,15 @@ import subprocess
 import os
 import re
 from pathlib import Path
-from typing import Any, Iterator, List, Optional, Tuple
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, Optional, Tuple
 from enum import Enum
 from dataclasses import dataclass, field
 from argparse import ArgumentParser
 from contextlib import contextmanager
 
 from libtmux.server import Server
-from libtmux.session import Session
-from libtmux.pane import Pane as TmuxPane
 
-from path_utils import get_exclusive_paths, Pane
+from path_utils import get_exclusive_paths, Pane, PaneInfo
 
 OPTIONS_PREFIX = '@tmux_window_name_'
 HOOK_INDEX = 8921
@@ -26,6 +26,28 @@ USR_BIN_REMOVER = (r'^(/usr)?/bin/(.+)', r'\g<2>')
 CUR_SYSTEM_REMOVER = (r'^/run/current-system/sw/bin/(.+)', r'\g<1>')
 PROFILE_REMOVER = (r'^/home/[a-zA-Z]*/.nix-profile/bin/(.+)', r'\g<1>')
 NIX_STORE_REMOVER = (r'^/nix/store/[^/]+/.nix-profile/bin/(.+)', r'\g<1>')
+DEFAULT_SUBSTITUTE_SETS = [
+    (r'.+ipython([32])', r'ipython\g<1>'),
+    USR_BIN_REMOVER,
+    CUR_SYSTEM_REMOVER,
+    PROFILE_REMOVER,
+    NIX_STORE_REMOVER,
+    (r'(bash) (.+)/(.+[ $])(.+)', r'\g<3>\g<4>'),
+    (r'.+poetry shell', 'poetry'),
+]
+# The built-in patterns use no \w/\s/\d/\b classes, so re.ASCII cannot change what
+# they match. User patterns keep full Unicode semantics (paths can be non-ASCII)
+_ASCII_SAFE_PATTERNS = frozenset(pattern for pattern, _ in DEFAULT_SUBSTITUTE_SETS)
+_USR_BIN_RE = re.compile(USR_BIN_REMOVER[0])
+_SCRIPT_PATH = str(Path(__file__).resolve())
+
+
+def _decode_icon(icon: str) -> str:
+    # Decode Unicode escape sequences if present
+    if icon.startswith('\\u'):
+        return icon.encode('utf-8').decode('unicode-escape')
+    return icon
+
 
 DEFAULT_PROGRAM_ICONS = {
     'nvim': '',  # nf-dev-vim
@@ -51,76 +73,96 @@ DEFAULT_PROGRAM_ICONS = {
     'fish': '',  # nf-dev-terminal
     'sh': '',  # nf-dev-terminal
 }
+DEFAULT_PROGRAM_ICONS = {name: _decode_icon(icon) for name, icon in DEFAULT_PROGRAM_ICONS.items()}
 
 
-def get_option(server: Server, option: str, default: Any) -> Any:
-    out = server.cmd('show-option', '-gv', f'{OPTIONS_PREFIX}{option}').stdout
-    if len(out) == 0:
-        return default
+def _unquote_option_value(value: str) -> str:
+    # `show-options -g` quotes values that contain spaces or specials, unlike `show-option -gv`
+    if len(value) >= 2 and value[0] == '"' and value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+    if len(value) >= 2 and value[0] == "'" and value[-1] == "'":
+        return value[1:-1]
+    return value
 
-    # If the option is icon_style and the output looks like a bare string (not quoted)
-    # wrap it in quotes to avoid NameError when evaluating
-    if option == 'icon_style' and out[0] and not (out[0].startswith("'") or out[0].startswith('"')):
-        return out[0]  # Return the raw string value
 
-    try:
-        return eval(out[0])
-    except NameError:
-        # If eval fails due to NameError, return the raw string
-        return out[0]
-
-
-def set_option(server: Server, option: str, val: str):
-    server.cmd('set-option', '-g', f'{OPTIONS_PREFIX}{option}', val)
+def _load_all_options(server: Server) -> Dict[str, str]:
+    # Fetch every @tmux_window_name_* option with a single tmux call instead of one per field
+    out = server.cmd('show-options', '-g').stdout
+    options_map = {}
+    for line in out:
+        name, _, value = line.partition(' ')
+        if not name.startswith(OPTIONS_PREFIX):
+            continue
 
+        options_map[name[len(OPTIONS_PREFIX) :]] = _unquote_option_value(value)
 
-def get_window_option(server: Server, window_id: Optional[str], option: str, default: Any) -> Any:
-    return get_window_tmux_option(server, window_id, f'{OPTIONS_PREFIX}{option}', default, do_eval=True)
+    return options_map
 
 
-def get_window_tmux_option(
-    server: Server, window_id: Optional[str], option: str, default: Any, do_eval: bool = False
-) -> Any:
-    arguments = ['show-option', '-wqv']
+def get_option(server: Server, option: str, default: Any, options_map: Optional[Dict[str, str]] = None) -> Any:
+    if options_map is not None:
+        if option not in options_map:
+            return default
+        value = options_map[option]
+    else:
+        out = server.cmd('show-option', '-gv', f'{OPTIONS_PREFIX}{option}').stdout
+        if len(out) == 0:
+            return default
+        value = out[0]
 
-    if window_id is not None:
-        arguments.append('-t')
-        arguments.append(window_id)
+    # If the option is icon_style and the output looks like a bare string (not quoted)
+    # return it as is, literal parsing would fail on it anyway
+    if option == 'icon_style' and value and not (value.startswith("'") or value.startswith('"')):
+        return value  # Return the raw string value
 
-    arguments.append(option)
-    out = server.cmd(*arguments).stdout
+    return _parse_option_value(value)
 
-    if len(out) == 0:
-        return default
 
-    if do_eval:
-        return eval(out[0])
+def _parse_option_value(value: str) -> Any:
+    # Parse literals (lists, ints, bools, dicts) without eval's compile step or code execution
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        # Not a Python literal, return the raw string
+        return value
 
-    return out[0]
 
+def set_option(server: Server, option: str, val: str):
+    server.cmd('set-option', '-g', f'{OPTIONS_PREFIX}{option}', val)
 
-def set_window_tmux_option(server: Server, window_id: Optional[str], option: str, value: str) -> Any:
-    arguments = ['set-option', '-wq']
-    if window_id is not None:
-        arguments.append('-t')
-        arguments.append(window_id)
 
-    arguments.append(option)
-    arguments.append(value)
+def run_tmux_commands(server: Server, commands: List[str]):
+    # Run a batch of tmux commands with a single source-file call instead of one fork per command
+    # Window names carry icons/emoji, force utf-8 instead of trusting the locale
+    with tempfile.NamedTemporaryFile(
+        'w', encoding='utf-8', prefix='tmux-window-name-', suffix='.conf', delete=False
+    ) as f:
+        f.write('\n'.join(commands) + '\n')
 
-    server.cmd(*arguments)
+    try:
+        server.cmd('source-file', f.name)
+    finally:
+        os.unlink(f.name)
 
 
 def post_restore(server: Server):
     # Re enable tmux-window-name if `automatic-rename` is on
-    for window in server.windows:
-        if get_window_tmux_option(server, window.window_id, 'automatic-rename', 'on') == 'on':
-            set_window_tmux_option(server, window.window_id, f'{OPTIONS_PREFIX}enabled', '1')
-        else:
-            set_window_tmux_option(server, window.window_id, f'{OPTIONS_PREFIX}enabled', '0')
+    out = server.cmd('list-windows', '-a', '-F', '#{window_id} #{automatic-rename}').stdout
+
+    commands = []
+    for line in out:
+        window_id, _, automatic_rename = line.partition(' ')
+        enabled = '1' if automatic_rename == 'on' else '0'
+        commands.append(f'set-option -wq -t {window_id} {OPTIONS_PREFIX}enabled {enabled}')
 
     # Enable rename hook to enable tmux-window-name on later windows
-    enable_user_rename_hook(server)
+    commands.append(f"set-hook -g after-rename-window[{HOOK_INDEX}] '{user_rename_hook_command()}'")
+
+    run_tmux_commands(server, commands)
+
+
+def user_rename_hook_command() -> str:
+    return f'if-shell "[ #{{n:window_name}} -gt 0 ]" "set -w @tmux_window_name_enabled 0" "set -w @tmux_window_name_enabled 1; run-shell "{_SCRIPT_PATH}"'
 
 
 def enable_user_rename_hook(server: Server):
@@ -134,12 +176,11 @@ def enable_user_rename_hook(server: Server):
     @tmux_window_name_enabled (window option):
         Indicator if we should rename the window or not
     """
-    current_file = Path(__file__).absolute()
     server.cmd(
         'set-hook',
         '-g',
         f'after-rename-window[{HOOK_INDEX}]',
-        f'if-shell "[ #{{n:window_name}} -gt 0 ]" "set -w @tmux_window_name_enabled 0" "set -w @tmux_window_name_enabled 1; run-shell "{current_file}"',
+        user_rename_hook_command(),
     )
 
 
@@ -178,20 +219,31 @@ class Options:
     use_tilde: bool = False
     icon_style: IconStyle = IconStyle.NAME
     custom_icons: dict = field(default_factory=lambda: {})  # User-defined program icons
-    substitute_sets: List[Tuple] = field(
-        default_factory=lambda: [
-            (r'.+ipython([32])', r'ipython\g<1>'),
-            USR_BIN_REMOVER,
-            CUR_SYSTEM_REMOVER,
-            PROFILE_REMOVER,
-            NIX_STORE_REMOVER,
-            (r'(bash) (.+)/(.+[ $])(.+)', r'\g<3>\g<4>'),
-            (r'.+poetry shell', 'poetry'),
-        ]
-    )
+    substitute_sets: List[Tuple] = field(default_factory=lambda: list(DEFAULT_SUBSTITUTE_SETS))
     dir_substitute_sets: List[Tuple] = field(default_factory=lambda: [])
     show_program_args: bool = True
     log_level: str = 'WARNING'
+    _compiled_substitute_sets: List[Callable[[str], str]] = field(init=False, repr=False)
+    _compiled_dir_substitute_sets: List[Callable[[str], str]] = field(init=False, repr=False)
+    _shells_set: FrozenSet[str] = field(init=False, repr=False)
+    _ignored_set: FrozenSet[str] = field(init=False, repr=False)
+    _dir_programs_set: FrozenSet[str] = field(init=False, repr=False)
+    _custom_icons_items: Tuple[Tuple[str, str], ...] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        # Compile substitution patterns once instead of probing re's cache on every substitution
+        self._compiled_substitute_sets = _compile_substitute_sets(self.substitute_sets)
+        self._compiled_dir_substitute_sets = _compile_substitute_sets(self.dir_substitute_sets)
+
+        # Frozen sets for O(1) membership tests in the per-process loops
+        self._shells_set = frozenset(self.shells)
+        self._ignored_set = frozenset(self.ignored_programs)
+        self._dir_programs_set = frozenset(self.dir_programs)
+
+        # Decode user icons once instead of on every get_program_icon call
+        self.custom_icons = {name: _decode_icon(icon) for name, icon in self.custom_icons.items()}
+        # Hashable form of custom_icons so icon lookups can be memoized
+        self._custom_icons_items = tuple(sorted(self.custom_icons.items()))
 
     @staticmethod
     def from_options(server: Server):
@@ -202,8 +254,11 @@ class Options:
                 return f.default_factory()
             return f.default
 
+        options_map = _load_all_options(server)
         fields_values = {
-            field.name: get_option(server, field.name, default_field_value(field)) for field in fields.values()
+            field.name: get_option(server, field.name, default_field_value(field), options_map)
+            for field in fields.values()
+            if field.init
         }
 
         # Convert icon_style from string to enum if it's a string
@@ -217,25 +272,30 @@ class Options:
         return Options(**fields_values)
 
 
+@functools.lru_cache(maxsize=256)
+def _compute_icon(base_name: str, custom_icons_items: Tuple[Tuple[str, str], ...]) -> str:
+    # First check custom icons, then fall back to built-in icons
+    return dict(custom_icons_items).get(base_name) or DEFAULT_PROGRAM_ICONS.get(base_name, '')
+
+
 def get_program_icon(program_name: str, options: Options) -> str:
     """Get the nerd font icon for a program name."""
-    # Remove any path components and arguments
-    base_name = program_name.split()[0].split('/')[-1]
+    # Remove any path components and arguments, partition avoids the list allocations of split
+    base_name = program_name.partition(' ')[0].rpartition('/')[2]
     # If the name contains a colon, use the part before it
-    if ':' in base_name:
-        base_name = base_name.split(':')[0]
+    base_name = base_name.partition(':')[0]
 
-    # First check custom icons, then fall back to built-in icons
-    icon = options.custom_icons.get(base_name) or DEFAULT_PROGRAM_ICONS.get(base_name, '')
+    icon = _compute_icon(base_name, options._custom_icons_items)
 
-    # Decode Unicode escape sequences if present
-    if icon.startswith('\\u'):
-        icon = icon.encode('utf-8').decode('unicode-escape')
-    logging.debug(f'Getting icon for program {program_name} (base_name: {base_name}) -> {icon!r}')
+    logging.debug('Getting icon for program %s (base_name: %s) -> %r', program_name, base_name, icon)
     return icon
 
 
 def apply_icon_if_in_style(name: str, options: Options) -> str:
+    # Cheap test first, no point parsing the program name when no icon will be applied
+    if options.icon_style == IconStyle.NAME:
+        return name
+
     new_name = name
     if options.icon_style in [IconStyle.ICON, IconStyle.NAME_AND_ICON]:
         icon = get_program_icon(name, options)
@@ -246,7 +306,7 @@ def apply_icon_if_in_style(name: str, options: Options) -> str:
             elif options.icon_style == IconStyle.NAME_AND_ICON:
                 new_name = f'{icon} {name}'
 
-            logging.debug(f'Applied icon {icon} to name, {name}. New name: {new_name}')
+            logging.debug('Applied icon %s to name, %s. New name: %s', icon, name, new_name)
     return new_name
 
 
@@ -261,90 +321,158 @@ def parse_shell_command(shell_cmd: List[bytes]) -> Optional[str]:
     return ' '.join(shell_cmd_str[1:])
 
 
-def get_current_program(running_programs: List[bytes], pane: TmuxPane, options: Options) -> Optional[str]:
-    if pane.pane_pid is None:
-        raise ValueError(f'Pane id is none, pane: {pane}')
-
-    logging.debug(f"searching for active pane's child with pane_pid={pane.pane_pid}")
-
-    for program in running_programs:
-        program = program.split()
+def get_current_program(ppid_index: Dict[int, List[bytes]], pane: PaneInfo, options: Options) -> Optional[str]:
+    logging.debug("searching for active pane's child with pane_pid=%s", pane.pane_pid)
 
-        # if pid matches parse program
-        if int(program[0]) == int(pane.pane_pid):
-            program = program[1:]
-            program_name = program[0].decode()
-            program_name_stripped = re.sub(USR_BIN_REMOVER[0], USR_BIN_REMOVER[1], program_name)
-            logging.debug(
-                f'program={program} program_name={program_name} program_name_stripped={program_name_stripped}'
-            )
+    for cmd_line in ppid_index.get(pane.pane_pid, []):
+        program = cmd_line.split()
+        program_name = program[0].decode()
+        program_name_stripped = _USR_BIN_RE.sub(USR_BIN_REMOVER[1], program_name)
+        logging.debug(
+            'program=%s program_name=%s program_name_stripped=%s', program, program_name, program_name_stripped
+        )
 
-            if len(program) > 1 and 'scripts/rename_session_windows.py' in program[1].decode():
-                logging.debug(f'skipping {program[1]}, its the script')
-                continue
+        if len(program) > 1 and 'scripts/rename_session_windows.py' in program[1].decode():
+            logging.debug('skipping %s, its the script', program[1])
+            continue
 
-            if program_name_stripped in options.ignored_programs:
-                logging.debug(f'skipping {program_name_stripped}, its ignored')
-                continue
+        if program_name_stripped in options._ignored_set:
+            logging.debug('skipping %s, its ignored', program_name_stripped)
+            continue
 
-            # Ignore shells
-            if program_name_stripped in options.shells:
-                shell_program = parse_shell_command(program)
-                logging.debug(f'its a shell, parsed shell program {shell_program}')
-                return shell_program
+        # Ignore shells
+        if program_name_stripped in options._shells_set:
+            shell_program = parse_shell_command(program)
+            logging.debug('its a shell, parsed shell program %s', shell_program)
+            return shell_program
 
-            if not options.show_program_args:
-                return program[0].decode()
+        if not options.show_program_args:
+            return program[0].decode()
 
-            return b' '.join(program).decode()
+        # Decode the original line instead of re-joining the split parts
+        return cmd_line.decode()
 
     return None
 
 
-def get_program_if_dir(program_line: str, dir_programs: List[str]) -> Optional[str]:
+def get_program_if_dir(program_line: str, dir_programs: FrozenSet[str]) -> Optional[str]:
     program = program_line.split()
 
-    for p in dir_programs:
-        if p == program[0]:
-            program[0] = p
-            return ' '.join(program)
+    if program[0] in dir_programs:
+        return ' '.join(program)
 
     return None
 
 
-def get_session_active_panes(session: Session) -> List[TmuxPane]:
-    session_windows_ids = [window.window_id for window in session.windows]
+def get_session_active_panes(server: Server, session_id: str) -> List[PaneInfo]:
+    # Ask tmux for the active panes of this session only, instead of scanning every pane
+    # of every session through libtmux
+    out = server.cmd(
+        'list-panes',
+        '-s',
+        '-t',
+        session_id,
+        '-F',
+        '#{pane_id} #{pane_pid} #{window_id} #{pane_current_path}',
+        '-f',
+        '#{pane_active}',
+    ).stdout
+
+    panes = []
+    for line in out:
+        # pane_current_path goes last, it may contain spaces
+        parts = line.split(' ', 3)
+        if len(parts) < 3:
+            continue
+
+        panes.append(
+            PaneInfo(
+                pane_id=parts[0],
+                pane_pid=int(parts[1]),
+                window_id=parts[2],
+                pane_current_path=parts[3] if len(parts) > 3 else None,
+            )
+        )
+
+    return panes
+
 
-    return [p for p in session.server.panes if p.pane_active == '1' and p.window_id in session_windows_ids]
+def tmux_quote(value: str) -> str:
+    # Shell-style single quoting, tmux's command parser understands the '\'' escape
+    escaped = value.replace("'", "'\\''")
+    return f"'{escaped}'"
 
 
-def rename_window(server: Server, window_id: str, window_name: str, max_name_len: int, options: Options):
-    logging.debug(f'renaming window_id={window_id} to window_name={window_name}')
+def rename_window(commands: List[str], window_id: str, window_name: str, max_name_len: int, options: Options):
+    logging.debug('renaming window_id=%s to window_name=%s', window_id, window_name)
 
     window_name = apply_icon_if_in_style(window_name, options)
     window_name = window_name[:max_name_len]
-    logging.debug(f'shortened name window_name={window_name}')
+    logging.debug('shortened name window_name=%s', window_name)
 
-    server.cmd('rename-window', '-t', window_id, window_name)
-    set_window_tmux_option(
-        server, window_id, 'automatic-rename-format', window_name
+    quoted_name = tmux_quote(window_name)
+    commands.append(f'rename-window -t {window_id} {quoted_name}')
+    commands.append(
+        f'set-option -wq -t {window_id} automatic-rename-format {quoted_name}'
     )  # Setting format the window name itself to make automatic-rename rename to to the same name
-    set_window_tmux_option(
-        server, window_id, 'automatic-rename', 'on'
+    commands.append(
+        f'set-option -wq -t {window_id} automatic-rename on'
     )  # Turn on automatic-rename to make resurrect remeber the option
 
 
-def get_panes_programs(session: Session, options: Options) -> List[Pane]:
-    session_active_panes = get_session_active_panes(session)
-    try:
-        running_programs = subprocess.check_output(['ps', '-a', '-oppid,command']).splitlines()[1:]
-        logging.debug(f'running_programs={running_programs}')
+def get_panes_programs(server: Server, session_id: str, options: Options) -> List[Pane]:
+    session_active_panes = get_session_active_panes(server, session_id)
+    ppid_index = _index_running_programs({p.pane_pid for p in session_active_panes})
+
+    # Stringifying the process lines is expensive, skip it unless debug is on
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug('ppid_index=%s', ppid_index)
+
+    return [Pane(p, get_current_program(ppid_index, p, options)) for p in session_active_panes]
+
+
+def _index_running_programs(wanted_ppids: set) -> Dict[int, List[bytes]]:
+    # Stream ps output and only keep lines whose ppid is a pane pid, instead of
+    # buffering and splitting the whole process table.
+    # A pane pid can parent several processes so every candidate line is kept
+    ppid_index: Dict[int, List[bytes]] = {}
+    if not wanted_ppids:
+        return ppid_index
+
+    # Empty column headers (the POSIX `=` convention) make ps skip the header line
+    proc = subprocess.Popen(['ps', '-a', '-oppid=,command='], stdout=subprocess.PIPE)
+    assert proc.stdout is not None
+    for line in proc.stdout:
+        parts = line.split(None, 1)
+        if len(parts) != 2:
+            continue
+
+        try:
+            ppid = int(parts[0])
+        except ValueError:
+            continue
+
+        if ppid in wanted_ppids:
+            # Store only the command line, the ppid column is already the dict key
+            ppid_index.setdefault(ppid, []).append(parts[1].rstrip(b'\n'))
+
     # can occur if ps has empty output
-    except subprocess.CalledProcessError:
-        logging.warning('nothing returned from `ps -a -oppid,command`')
-        running_programs = []
+    if proc.wait() != 0:
+        logging.warning('nothing returned from `ps -a -oppid=,command=`')
+
+    return ppid_index
+
+
+def get_enabled_windows_map(server: Server) -> Dict[str, bool]:
+    # Fetch every window's enabled option with one tmux call instead of one per window
+    out = server.cmd('list-windows', '-a', '-F', f'#{{window_id}} #{{{OPTIONS_PREFIX}enabled}}').stdout
+
+    enabled_map = {}
+    for line in out:
+        window_id, _, value = line.partition(' ')
+        enabled_map[window_id] = value != '0'  # Unset means enabled
 
-    return [Pane(p, get_current_program(running_programs, p, options)) for p in session_active_panes]
+    return enabled_map
 
 
 def rename_windows(server: Server, options: Options):
@@ -352,51 +480,64 @@ def rename_windows(server: Server, options: Options):
         if already_running:
             return
 
-        current_session = get_current_session(server)
+        session_id = get_current_session_id(server)
 
-        panes_programs = get_panes_programs(current_session, options)
+        panes_programs = get_panes_programs(server, session_id, options)
         panes_programs = [fix_pane_path(p, options) for p in panes_programs]
-        panes_with_programs = [p for p in panes_programs if p.program is not None]
-        panes_with_dir = [p for p in panes_programs if p.program is None]
 
-        logging.debug(f'panes_with_programs={panes_with_programs}')
-        logging.debug(f'panes_with_dir={panes_with_dir}')
+        # Split panes in one pass instead of two comprehensions over the same list
+        panes_with_programs: List[Pane] = []
+        panes_with_dir: List[Pane] = []
+        append_program, append_dir = panes_with_programs.append, panes_with_dir.append
+        for p in panes_programs:
+            (append_program if p.program is not None else append_dir)(p)
+
+        logging.debug('panes_with_programs=%s', panes_with_programs)
+        logging.debug('panes_with_dir=%s', panes_with_dir)
+
+        enabled_map = get_enabled_windows_map(server)
+        rename_commands: List[str] = []
 
         for pane in panes_with_programs:
-            enabled_in_window = get_window_option(server, pane.info.window_id, 'enabled', 1)
+            enabled_in_window = enabled_map.get(pane.info.window_id, True)
             if not enabled_in_window:
-                logging.debug(f'tmux winodw isnt enabled in {pane.info.window_id}')
+                logging.debug('tmux winodw isnt enabled in %s', pane.info.window_id)
                 continue
 
-            program_name = get_program_if_dir(str(pane.program), options.dir_programs)
+            program_name = get_program_if_dir(str(pane.program), options._dir_programs_set)
             if program_name is not None:
-                logging.debug(f'program is a dir program, program:{str(pane.program)}')
+                logging.debug('program is a dir program, program:%s', pane.program)
                 pane.program = program_name
                 panes_with_dir.append(pane)
                 continue
 
-            logging.debug(f'processing program without dir: {str(pane.program)}')
-            pane.program = substitute_name(str(pane.program), options.substitute_sets)
-            rename_window(server, str(pane.info.window_id), pane.program, options.max_name_len, options)
+            logging.debug('processing program without dir: %s', pane.program)
+            pane.program = substitute_name(str(pane.program), options._compiled_substitute_sets)
+            rename_window(rename_commands, str(pane.info.window_id), pane.program, options.max_name_len, options)
 
         exclusive_paths = get_exclusive_paths(panes_with_dir)
         logging.debug(
-            f'get_exclusive_paths result, input: panes_with_dir={panes_with_dir}, output: exclusive_paths={exclusive_paths}'
+            'get_exclusive_paths result, input: panes_with_dir=%s, output: exclusive_paths=%s',
+            panes_with_dir,
+            exclusive_paths,
         )
 
         for p, display_path in exclusive_paths:
-            enabled_in_window = get_window_option(server, p.info.window_id, 'enabled', 1)
+            enabled_in_window = enabled_map.get(p.info.window_id, True)
             if not enabled_in_window:
-                logging.debug(f'tmux winodw isnt enabled in {p.info.window_id}')
+                logging.debug('tmux winodw isnt enabled in %s', p.info.window_id)
                 continue
 
-            logging.debug(f'processing exclusive_path: display_path={display_path} p.program={p.program}')
-            display_path = substitute_name(str(display_path), options.dir_substitute_sets)
+            logging.debug('processing exclusive_path: display_path=%s p.program=%s', display_path, p.program)
+            display_path = substitute_name(str(display_path), options._compiled_dir_substitute_sets)
             if p.program is not None:
-                p.program = substitute_name(p.program, options.substitute_sets)
+                p.program = substitute_name(p.program, options._compiled_substitute_sets)
                 display_path = f'{p.program}:{display_path}'
 
-            rename_window(server, str(p.info.window_id), str(display_path), options.max_name_len, options)
+            rename_window(rename_commands, str(p.info.window_id), str(display_path), options.max_name_len, options)
+
+        if rename_commands:
+            run_tmux_commands(server, rename_commands)
 
 
 # Fix pane path according to the options
@@ -407,34 +548,72 @@ def fix_pane_path(pane: Pane, options: Options) -> Pane:
 
     if options.use_tilde:
         path = path.replace(HOME_DIR, '~')
-        logging.debug(f'replaced tilde with HOME_DIR={HOME_DIR}: path={path}')
+        logging.debug('replaced tilde with HOME_DIR=%s: path=%s', HOME_DIR, path)
 
     pane.info.pane_current_path = path
     return pane
 
 
-def get_current_session(server: Server) -> Session:
-    session_id = server.cmd('display-message', '-p', '#{session_id}').stdout[0]
-    return Session(server, session_id=session_id)
+def get_current_session_id(server: Server) -> str:
+    # The id string is all the targeted list-panes query needs, skip libtmux's
+    # Session bootstrap which issues extra tmux calls to hydrate attributes
+    return server.cmd('display-message', '-p', '#{session_id}').stdout[0]
+
+
+_REGEX_METACHARS = '.^$*+?{}[]()|\\'
+
+
+def _make_prefix_stripper(pattern: str, replacement: str) -> Optional[Callable[[str], str]]:
+    # Specialize anchored prefix strippers like '^<literal>(.+)' into plain string ops
+    if replacement not in (r'\g<1>', r'\1'):
+        return None
+
+    match = re.fullmatch(r'\^(.+)\(\.\+\)', pattern)
+    if match is None:
+        return None
+
+    prefix = match.group(1)
+    if any(c in _REGEX_METACHARS for c in prefix):
+        return None
+
+    def strip_prefix(name: str, _prefix: str = prefix) -> str:
+        return name[len(_prefix) :] if name.startswith(_prefix) else name
+
+    return strip_prefix
 
 
-def substitute_name(name: str, substitute_sets: List[Tuple]) -> str:
-    logging.debug(f'substituting {name}')
+def _compile_substitute_sets(substitute_sets: List[Tuple]) -> List[Callable[[str], str]]:
+    compiled = []
     for pattern, replacement in substitute_sets:
-        name = re.sub(pattern, replacement, name)
-        logging.debug(f'after pattern={pattern} replacement={replacement}: {name}')
+        substitute = _make_prefix_stripper(pattern, replacement)
+        if substitute is None:
+            # re.ASCII skips consulting Unicode tables but is only safe for the built-in
+            # patterns, user patterns may rely on \w etc. matching non-ASCII
+            flags = re.ASCII if pattern in _ASCII_SAFE_PATTERNS else 0
+            substitute = functools.partial(re.compile(pattern, flags).sub, replacement)
+
+        compiled.append(substitute)
+
+    return compiled
+
+
+def substitute_name(name: str, substitute_sets: List[Callable[[str], str]]) -> str:
+    logging.debug('substituting %s', name)
+    for substitute in substitute_sets:
+        name = substitute(name)
 
+    logging.debug('substituted to %s', name)
     return name
 
 
 def print_programs(server: Server, options: Options):
-    current_session = get_current_session(server)
+    session_id = get_current_session_id(server)
 
-    panes_programs = get_panes_programs(current_session, options)
+    panes_programs = get_panes_programs(server, session_id, options)
 
     for pane in panes_programs:
         if pane.program:
-            program_name = substitute_name(pane.program, options.substitute_sets)
+            program_name = substitute_name(pane.program, options._compiled_substitute_sets)
             program_name = apply_icon_if_in_style(program_name, options)
             print(f'{pane.program} -> {program_name}')
 
@@ -468,8 +647,8 @@ def main():
     logging.basicConfig(
         level=log_level, filename=log_file, format='%(levelname)s - %(filename)s:%(lineno)d %(funcName)s() %(message)s'
     )
-    logging.debug(f'Args: {args}')
-    logging.debug(f'Options: {options}')
+    logging.debug('Args: %s', args)
+    logging.debug('Options: %s', options)
 
     if args.print_programs:
         print_programs(server, options)
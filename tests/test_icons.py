@@ -3,7 +3,7 @@
 import sys
 from dataclasses import dataclass
 from typing import Optional
-from unittest.mock import Mock, patch, call
+from unittest.mock import Mock
 
 sys.path.append('scripts/')
 
@@ -52,69 +52,52 @@ def test_get_program_icon_with_args():
     assert get_program_icon('nvim file.txt', options) == DEFAULT_PROGRAM_ICONS['nvim']
 
 
+def _expected_rename_commands(name: str) -> list:
+    return [
+        f"rename-window -t 1 '{name}'",
+        f"set-option -wq -t 1 automatic-rename-format '{name}'",
+        'set-option -wq -t 1 automatic-rename on',
+    ]
+
+
 def test_rename_window_name_style():
     """Test window renaming with 'name' style (default)"""
-    server = FakeServer()
+    commands = []
     options = Options(icon_style=IconStyle.NAME)
-    rename_window(server, '1', 'python', 20, options)
-    expected_calls = [
-        call('rename-window', '-t', '1', 'python'),
-        call('set-option', '-wq', '-t', '1', 'automatic-rename-format', 'python'),
-        call('set-option', '-wq', '-t', '1', 'automatic-rename', 'on'),
-    ]
-    assert server.cmd.call_args_list == expected_calls
+    rename_window(commands, '1', 'python', 20, options)
+    assert commands == _expected_rename_commands('python')
 
 
 def test_rename_window_icon_style():
     """Test window renaming with 'icon' style"""
-    server = FakeServer()
+    commands = []
     options = Options(icon_style=IconStyle.ICON)
-    rename_window(server, '1', 'python', 20, options)
-    expected_calls = [
-        call('rename-window', '-t', '1', DEFAULT_PROGRAM_ICONS['python']),
-        call('set-option', '-wq', '-t', '1', 'automatic-rename-format', DEFAULT_PROGRAM_ICONS['python']),
-        call('set-option', '-wq', '-t', '1', 'automatic-rename', 'on'),
-    ]
-    assert server.cmd.call_args_list == expected_calls
+    rename_window(commands, '1', 'python', 20, options)
+    assert commands == _expected_rename_commands(DEFAULT_PROGRAM_ICONS['python'])
 
 
 def test_rename_window_name_and_icon_style():
     """Test window renaming with 'name_and_icon' style"""
-    server = FakeServer()
+    commands = []
     options = Options(icon_style=IconStyle.NAME_AND_ICON)
-    rename_window(server, '1', 'python', 20, options)
-    expected_calls = [
-        call('rename-window', '-t', '1', f'{DEFAULT_PROGRAM_ICONS["python"]} python'),
-        call('set-option', '-wq', '-t', '1', 'automatic-rename-format', f'{DEFAULT_PROGRAM_ICONS["python"]} python'),
-        call('set-option', '-wq', '-t', '1', 'automatic-rename', 'on'),
-    ]
-    assert server.cmd.call_args_list == expected_calls
+    rename_window(commands, '1', 'python', 20, options)
+    assert commands == _expected_rename_commands(f'{DEFAULT_PROGRAM_ICONS["python"]} python')
 
 
 def test_rename_window_custom_icon():
     """Test window renaming with custom icon"""
-    server = FakeServer()
+    commands = []
     options = Options(icon_style=IconStyle.NAME_AND_ICON, custom_icons={'python': '🐍'})
-    rename_window(server, '1', 'python', 20, options)
-    expected_calls = [
-        call('rename-window', '-t', '1', '🐍 python'),
-        call('set-option', '-wq', '-t', '1', 'automatic-rename-format', '🐍 python'),
-        call('set-option', '-wq', '-t', '1', 'automatic-rename', 'on'),
-    ]
-    assert server.cmd.call_args_list == expected_calls
+    rename_window(commands, '1', 'python', 20, options)
+    assert commands == _expected_rename_commands('🐍 python')
 
 
 def test_rename_window_max_length():
     """Test that window names respect max_name_len"""
-    server = FakeServer()
+    commands = []
     options = Options(icon_style=IconStyle.NAME_AND_ICON, max_name_len=10)
-    rename_window(server, '1', 'python', 10, options)
-    expected_calls = [
-        call('rename-window', '-t', '1', f'{DEFAULT_PROGRAM_ICONS["python"]} python'),
-        call('set-option', '-wq', '-t', '1', 'automatic-rename-format', f'{DEFAULT_PROGRAM_ICONS["python"]} python'),
-        call('set-option', '-wq', '-t', '1', 'automatic-rename', 'on'),
-    ]
-    assert server.cmd.call_args_list == expected_calls
+    rename_window(commands, '1', 'python', 10, options)
+    assert commands == _expected_rename_commands(f'{DEFAULT_PROGRAM_ICONS["python"]} python')
 
 
 def test_get_program_icon_with_colon():
@@ -127,7 +110,7 @@ def test_get_program_icon_with_colon():
 def test_custom_icons_from_dictionary():
     """Test that custom icons can be parsed from a dictionary"""
     server = FakeServer()
-    server.cmd.return_value.stdout = ['{"python": "🐍", "custom": "📦", "nvim": "󰹻"}']
+    server.cmd.return_value.stdout = ['@tmux_window_name_custom_icons {"python": "🐍", "custom": "📦", "nvim": "󰹻"}']
     options = Options.from_options(server)
     assert get_program_icon('python', options) == '🐍'
     assert get_program_icon('custom', options) == '📦'